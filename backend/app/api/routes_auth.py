@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from typing import Optional
 
@@ -16,45 +16,58 @@ from app.services.auth_service import (
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from app.services.nutrition_service import NutritionCalculatorService
+from app.services import auth_cache
 
 router = APIRouter()
 security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user"""
-    token_data = verify_token(credentials.credentials)
-    if token_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user = get_user_by_email(db, email=token_data.email)
+    cache_key = auth_cache.token_key(credentials.credentials)
+    cached = auth_cache.get_cached_token(cache_key)
+    if cached is not None:
+        email = cached[0]
+    else:
+        token_data = verify_token(credentials.credentials)
+        if token_data is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        email = token_data.email
+        auth_cache.store_token(cache_key, email, token_data.exp)
+
+    cached_user = auth_cache.get_cached_user(email)
+    if cached_user is not None:
+        return await db.merge(cached_user, load=False)
+
+    user = await get_user_by_email(db, email=email)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    auth_cache.store_user(email, user)
     return user
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
-    existing_user = get_user_by_email(db, email=user_data.email)
+    existing_user = await get_user_by_email(db, email=user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    user = create_user(db, user_data)
-    
+
+    user = await create_user(db, user_data)
+
     if all([user.current_weight_kg, user.height_cm, user.age, user.gender]):
-        NutritionCalculatorService.update_user_nutrition_profile(db, user)
+        await NutritionCalculatorService.update_user_nutrition_profile(db, user, commit=True)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -65,9 +78,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=Token)
-async def login(email: str, password: str, db: Session = Depends(get_db)):
+async def login(email: str, password: str, db: AsyncSession = Depends(get_db)):
     """Login user"""
-    user = authenticate_user(db, email, password)
+    user = await authenticate_user(db, email, password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -90,18 +103,28 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
 
 @router.put("/me", response_model=UserSchema)
 async def update_profile(
-    user_update: UserUpdate, 
+    user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user profile"""
+    tracked_fields = ("current_weight_kg", "height_cm", "age", "gender", "goal", "activity_level")
+    old_values = {field: getattr(current_user, field) for field in tracked_fields}
+
     for field, value in user_update.dict(exclude_unset=True).items():
         setattr(current_user, field, value)
-    
-    if any([user_update.current_weight_kg, user_update.height_cm, user_update.age, user_update.gender]):
-        current_user = NutritionCalculatorService.update_user_nutrition_profile(db, current_user)
-    
-    db.commit()
-    db.refresh(current_user)
-    
+
+    # only recompute nutrition when a field that feeds the calculation
+    # actually changed, not whenever one happens to be present in the payload
+    changed = any(getattr(current_user, field) != old_values[field] for field in tracked_fields)
+    if changed and all([current_user.current_weight_kg, current_user.height_cm, current_user.age, current_user.gender]):
+        current_user = await NutritionCalculatorService.update_user_nutrition_profile(db, current_user)
+
+    await db.commit()
+    # with expire_on_commit disabled the object keeps its state after commit;
+    # only updated_at is assigned server-side, so reload just that column
+    await db.refresh(current_user, attribute_names=["updated_at"])
+
+    auth_cache.invalidate_user(current_user.email)
+
     return current_user
\ No newline at end of file
@@ -1,21 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
-from sqlalchemy.orm import Session
-import json
+import asyncio
+import os
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.db.models import User, DetectionLog
-from app.schemas import DetectionResponse
+from app.schemas import DetectionResponse, IngredientDetection
 from app.api.routes_auth import get_current_user
-from app.services.detect_service import IngredientDetectionService
+from app.services.detect_service import IngredientDetectionService, get_detection_service
 
 router = APIRouter()
 
+# responses are built from data we produced ourselves, so validation is
+# redundant work on the hot path - keep it available for dev/test runs
+_VALIDATE_RESPONSES = os.getenv("ENABLE_VALIDATION", "").lower() in ("1", "true", "yes")
+
+def _build_detection_response(result: dict) -> DetectionResponse:
+    if _VALIDATE_RESPONSES:
+        return DetectionResponse(
+            ingredients=result["ingredients"],
+            detected_count=result["detected_count"],
+            processing_time_ms=result["processing_time_ms"],
+        )
+    # model_construct is shallow, so the nested list is built by hand
+    return DetectionResponse.model_construct(
+        ingredients=[
+            IngredientDetection.model_construct(
+                ingredient=d.ingredient,
+                confidence=d.confidence,
+                bbox=list(d.bbox),
+            )
+            for d in result["ingredients"]
+        ],
+        detected_count=result["detected_count"],
+        processing_time_ms=result["processing_time_ms"],
+    )
+
+async def _persist_detection(user_id: int, ingredients: List[str], confidence_scores: List[float]):
+    """Write the detection log after the response has gone out"""
+    async with SessionLocal() as db:
+        db.add(DetectionLog(
+            user_id=user_id,
+            detected_ingredients=ingredients,
+            confidence_scores=confidence_scores,
+            image_path=None,
+        ))
+        await db.commit()
+
 @router.post("/ingredients", response_model=DetectionResponse)
 async def detect_ingredients(
+    request: Request,
+    background: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
 ):
     """
     Detect ingredients in uploaded image
@@ -27,33 +67,30 @@ async def detect_ingredients(
         )
     
     try:
-        image_bytes = await file.read()
-        
-        from app.main import app
-        detector: IngredientDetectionService = app.state.detector
-        
+        detector: IngredientDetectionService = request.app.state.detector or get_detection_service()
+
         if not detector:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Detection service not available"
             )
-        
-        detection_result = detector.detect_ingredients(image_bytes)
-        
-        detection_log = DetectionLog(
-            user_id=current_user.id,
-            detected_ingredients=json.dumps([ing["ingredient"] for ing in detection_result["ingredients"]]),
-            confidence_scores=json.dumps([ing["confidence"] for ing in detection_result["ingredients"]]),
-            image_path=None 
-        )
-        db.add(detection_log)
-        db.commit()
-        
-        return DetectionResponse(
-            ingredients=detection_result["ingredients"],
-            detected_count=detection_result["detected_count"],
-            processing_time_ms=detection_result["processing_time_ms"]
-        )
+
+        # hand the spooled upload straight to the decoder instead of
+        # buffering the whole image into memory first; when the batcher is
+        # running, concurrent uploads share one batched forward pass
+        if detector.batching_enabled():
+            detection_result = await detector.detect_ingredients_batched(file.file)
+        else:
+            loop = asyncio.get_running_loop()
+            detection_result = await loop.run_in_executor(
+                request.app.state.infer_pool, detector.detect_ingredients_stream, file.file
+            )
+
+        ings = detection_result["ingredients"]
+        names, confs = zip(*((i.ingredient, i.confidence) for i in ings)) if ings else ((), ())
+        background.add_task(_persist_detection, current_user.id, list(names), list(confs))
+
+        return _build_detection_response(detection_result)
         
     except Exception as e:
         raise HTTPException(
@@ -64,24 +101,32 @@ async def detect_ingredients(
 @router.get("/history")
 async def get_detection_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     limit: int = 50
 ):
     """Get user's detection history"""
-    detections = db.query(DetectionLog)\
-        .filter(DetectionLog.user_id == current_user.id)\
-        .order_by(DetectionLog.created_at.desc())\
-        .limit(limit)\
-        .all()
-    
-    history = []
-    for detection in detections:
-        history.append({
+    result = await db.execute(
+        select(
+            DetectionLog.id,
+            DetectionLog.detected_ingredients,
+            DetectionLog.confidence_scores,
+            DetectionLog.created_at,
+        )
+        .where(DetectionLog.user_id == current_user.id)
+        .order_by(DetectionLog.created_at.desc())
+        .limit(limit)
+    )
+    detections = result.all()
+
+    history = [
+        {
             "id": detection.id,
-            "ingredients": json.loads(detection.detected_ingredients) if detection.detected_ingredients else [],
-            "confidence_scores": json.loads(detection.confidence_scores) if detection.confidence_scores else [],
+            "ingredients": detection.detected_ingredients or [],
+            "confidence_scores": detection.confidence_scores or [],
             "created_at": detection.created_at
-        })
+        }
+        for detection in detections
+    ]
 
     return {"history": history, "total_count": len(history)}
 
@@ -91,15 +136,15 @@ async def append_detection_history(
     ingredients: List[str],
     confidence_scores: List[float],
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     log = DetectionLog(
         user_id=current_user.id,
-        detected_ingredients=json.dumps(ingredients),
-        confidence_scores=json.dumps(confidence_scores),
+        detected_ingredients=ingredients,
+        confidence_scores=confidence_scores,
         image_path=None,
     )
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    await db.commit()
+    await db.refresh(log)
     return {"id": log.id, "created_at": log.created_at}
@@ -1,6 +1,7 @@
 from collections import Counter
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import json
 
 from app.db.database import get_db
@@ -11,8 +12,11 @@ router = APIRouter()
 
 
 @router.get("/weekly")
-async def weekly_insights(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    meal_logs = db.query(MealLog).filter(MealLog.user_id == current_user.id).order_by(MealLog.created_at.desc()).limit(30).all()
+async def weekly_insights(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(MealLog).where(MealLog.user_id == current_user.id).order_by(MealLog.created_at.desc()).limit(30)
+    )
+    meal_logs = result.scalars().all()
     calories = []
     protein = []
     food_counter = Counter()
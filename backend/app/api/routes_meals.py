@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import json
 
 from app.api.routes_auth import get_current_user
@@ -11,7 +12,7 @@ router = APIRouter()
 
 
 @router.post("/log")
-async def log_meal(meal: MealLogCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def log_meal(meal: MealLogCreate, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not meal.meal_name.strip():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Meal name is required")
 
@@ -26,8 +27,8 @@ async def log_meal(meal: MealLogCreate, current_user: User = Depends(get_current
         notes=meal.notes,
     )
     db.add(meal_log)
-    db.commit()
-    db.refresh(meal_log)
+    await db.commit()
+    await db.refresh(meal_log)
 
     return {
         "id": meal_log.id,
@@ -39,8 +40,11 @@ async def log_meal(meal: MealLogCreate, current_user: User = Depends(get_current
 
 
 @router.get("/history")
-async def meal_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db), limit: int = 50):
-    logs = db.query(MealLog).filter(MealLog.user_id == current_user.id).order_by(MealLog.created_at.desc()).limit(limit).all()
+async def meal_history(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db), limit: int = 50):
+    result = await db.execute(
+        select(MealLog).where(MealLog.user_id == current_user.id).order_by(MealLog.created_at.desc()).limit(limit)
+    )
+    logs = result.scalars().all()
     return {
         "history": [
             {
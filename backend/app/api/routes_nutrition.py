@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import hashlib
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
 from app.db.models import User
@@ -10,9 +13,17 @@ from app.services.food_catalog_service import food_catalog_service
 router = APIRouter()
 
 @router.get("/profile")
-async def get_nutrition_profile(current_user: User = Depends(get_current_user)):
+async def get_nutrition_profile(request: Request, current_user: User = Depends(get_current_user)):
     """Get user's nutrition profile and targets"""
-    return {
+    # the profile only changes when the user edits it, so let clients poll
+    # cheaply with a conditional request
+    etag = hashlib.sha1(
+        f"{current_user.updated_at}-{current_user.target_calories}".encode()
+    ).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
+    payload = {
         "user_id": current_user.id,
         "goal": current_user.goal,
         "activity_level": current_user.activity_level,
@@ -32,11 +43,16 @@ async def get_nutrition_profile(current_user: User = Depends(get_current_user)):
             "gender": current_user.gender
         }
     }
+    return Response(
+        content=orjson.dumps(payload),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=60"},
+    )
 
 @router.post("/recalculate")
 async def recalculate_nutrition_profile(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Recalculate user's nutrition profile"""
     if not all([current_user.current_weight_kg, current_user.height_cm, current_user.age, current_user.gender]):
@@ -45,7 +61,7 @@ async def recalculate_nutrition_profile(
             detail="Missing required profile information (weight, height, age, gender)"
         )
     
-    updated_user = NutritionCalculatorService.update_user_nutrition_profile(db, current_user)
+    updated_user = await NutritionCalculatorService.update_user_nutrition_profile(db, current_user, commit=True)
     
     return {
         "message": "Nutrition profile updated successfully",
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.api.routes_auth import get_current_user
@@ -11,21 +12,26 @@ router = APIRouter()
 
 
 @router.get("")
-async def list_pantry_items(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    items = db.query(PantryItemRecord).filter(PantryItemRecord.user_id == current_user.id).order_by(PantryItemRecord.created_at.desc()).all()
-    return {"items": items}
+async def list_pantry_items(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(PantryItemRecord).where(PantryItemRecord.user_id == current_user.id).order_by(PantryItemRecord.created_at.desc())
+    )
+    return {"items": result.scalars().all()}
 
 
 @router.post("")
-async def upsert_pantry_items(items: List[PantryItemRecordCreate], current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def upsert_pantry_items(items: List[PantryItemRecordCreate], current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     saved = []
     for item in items:
         existing = None
         if item.external_id:
-            existing = db.query(PantryItemRecord).filter(
-                PantryItemRecord.user_id == current_user.id,
-                PantryItemRecord.external_id == item.external_id,
-            ).first()
+            result = await db.execute(
+                select(PantryItemRecord).where(
+                    PantryItemRecord.user_id == current_user.id,
+                    PantryItemRecord.external_id == item.external_id,
+                )
+            )
+            existing = result.scalars().first()
         if existing:
             existing.name = item.name
             existing.category = item.category
@@ -47,7 +53,7 @@ async def upsert_pantry_items(items: List[PantryItemRecordCreate], current_user:
             )
             db.add(record)
             saved.append(record)
-    db.commit()
+    await db.commit()
     for record in saved:
-        db.refresh(record)
+        await db.refresh(record)
     return {"items": saved}
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.api.routes_auth import get_current_user
@@ -11,21 +12,24 @@ router = APIRouter()
 
 
 @router.get("")
-async def list_recipe_likes(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    likes = db.query(RecipeLikeRecord).filter(RecipeLikeRecord.user_id == current_user.id).all()
-    return {"likes": likes}
+async def list_recipe_likes(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(RecipeLikeRecord).where(RecipeLikeRecord.user_id == current_user.id))
+    return {"likes": result.scalars().all()}
 
 
 @router.post("")
-async def sync_recipe_likes(items: List[RecipeLikeSync], current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def sync_recipe_likes(items: List[RecipeLikeSync], current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     for item in items:
-        existing = db.query(RecipeLikeRecord).filter(
-            RecipeLikeRecord.user_id == current_user.id,
-            RecipeLikeRecord.recipe_id == item.recipe_id,
-        ).first()
+        result = await db.execute(
+            select(RecipeLikeRecord).where(
+                RecipeLikeRecord.user_id == current_user.id,
+                RecipeLikeRecord.recipe_id == item.recipe_id,
+            )
+        )
+        existing = result.scalars().first()
         if existing:
             existing.liked = item.liked
         else:
             db.add(RecipeLikeRecord(user_id=current_user.id, recipe_id=item.recipe_id, liked=item.liked))
-    db.commit()
+    await db.commit()
     return {"ok": True}
@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import json
+import orjson
 
 from app.db.database import get_db
 from app.db.models import User, DetectionLog
 from app.schemas import Recipe
 from app.api.routes_auth import get_current_user
 from app.services.recipe_service import groq_recipe_service
+from app.services.recipe_recommendation_service import RecipeRecommendationService
 from app.services.food_catalog_service import food_catalog_service
 
 router = APIRouter()
 
+def get_recipe_service(request: Request) -> RecipeRecommendationService:
+    """Fetch the singleton built in the startup event"""
+    return request.app.state.recipe_service
+
 @router.post("/generate")
-async def generate_recipes_from_ingredients(ingredients: List[str], current_user: User = Depends(get_current_user), db: Session = Depends(get_db), recipe_count: int = Query(5, ge=1, le=10)):
+async def generate_recipes_from_ingredients(ingredients: List[str], current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db), recipe_count: int = Query(5, ge=1, le=10)):
     if not ingredients:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -21,7 +27,7 @@ async def generate_recipes_from_ingredients(ingredients: List[str], current_user
         )
     
     try:
-        recipe_response = groq_recipe_service.generate_recipes(
+        recipe_response = await groq_recipe_service.generate_recipes(
             ingredients=ingredients,
             user=current_user,
             recipe_count=recipe_count
@@ -32,12 +38,12 @@ async def generate_recipes_from_ingredients(ingredients: List[str], current_user
             
             detection_log = DetectionLog(
                 user_id=current_user.id,
-                detected_ingredients=json.dumps(ingredients),
-                confidence_scores=json.dumps([1.0] * len(ingredients)),
-                recommended_recipe_ids=json.dumps(recipe_names)
+                detected_ingredients=ingredients,
+                confidence_scores=[1.0] * len(ingredients),
+                recommended_recipe_ids=recipe_names
             )
             db.add(detection_log)
-            db.commit()
+            await db.commit()
         
         return {
             "success": True,
@@ -58,10 +64,46 @@ async def generate_recipes_from_ingredients(ingredients: List[str], current_user
             detail=f"Recipe generation failed: {str(e)}"
         )
 
+@router.post("/generate-with-plan")
+async def generate_recipes_with_meal_plan(
+    ingredients: List[str],
+    current_user: User = Depends(get_current_user),
+    recipe_count: int = Query(5, ge=1, le=10),
+    days: int = Query(3, ge=1, le=7),
+):
+    """Recipes plus a meal plan in a single LLM round trip"""
+    if not ingredients:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one ingredient is required"
+        )
+
+    try:
+        result = await groq_recipe_service.generate_recipes_and_plan(
+            ingredients=ingredients,
+            user=current_user,
+            recipe_count=recipe_count,
+            days=days,
+        )
+        return {
+            "success": True,
+            "ingredients_used": ingredients,
+            "recipes": result.get("recipes", []),
+            "meal_plan": result.get("meal_plan", []),
+            "generation_method": result.get("generation_method"),
+            "days": days,
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Recipe + meal plan generation failed: {str(e)}"
+        )
+
 @router.post("/meal-plan")
 async def generate_meal_plan(ingredients: List[str], current_user: User = Depends(get_current_user), days: int = Query(3, ge=1, le=7)):
     try:
-        meal_plan_response = groq_recipe_service.generate_meal_plan(
+        meal_plan_response = await groq_recipe_service.generate_meal_plan(
             ingredients=ingredients,
             user=current_user,
             days=days
@@ -113,7 +155,7 @@ async def suggest_complementary_ingredients(base_ingredients: List[str], current
                     }}
                 """
         
-        response = groq_recipe_service.client.chat.completions.create(
+        response = await groq_recipe_service.client.chat.completions.create(
             messages=[
                 {"role": "system", "content": "You are a professional chef and nutritionist."},
                 {"role": "user", "content": prompt}
@@ -123,7 +165,7 @@ async def suggest_complementary_ingredients(base_ingredients: List[str], current
             response_format={"type": "json_object"}
         )
         
-        suggestions = json.loads(response.choices[0].message.content)
+        suggestions = orjson.loads(response.choices[0].message.content)
         
         return {
             "base_ingredients": base_ingredients,
@@ -137,6 +179,49 @@ async def suggest_complementary_ingredients(base_ingredients: List[str], current
             detail=f"Ingredient suggestion failed: {str(e)}"
         )
 
+@router.post("/recommend")
+async def recommend_recipes(
+    ingredients: List[str],
+    current_user: User = Depends(get_current_user),
+    recipe_service: RecipeRecommendationService = Depends(get_recipe_service),
+    limit: int = Query(10, ge=1, le=50),
+):
+    if not ingredients:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one ingredient is required"
+        )
+
+    recommendations = recipe_service.find_matching_recipes(ingredients, current_user, limit)
+    return {
+        "recommendations": recommendations,
+        "total_count": len(recommendations),
+        "ingredients_used": ingredients,
+    }
+
+@router.get("/search")
+async def search_recipes(
+    query: Optional[str] = None,
+    tag: Optional[str] = None,
+    max_calories: Optional[float] = None,
+    min_protein: Optional[float] = None,
+    limit: int = Query(20, ge=1, le=100),
+    recipe_service: RecipeRecommendationService = Depends(get_recipe_service),
+    db: AsyncSession = Depends(get_db),
+):
+    results = await recipe_service.search_recipes(db, query, tag, max_calories, min_protein, limit)
+    return {"results": results, "total_count": len(results)}
+
+@router.get("/popular")
+async def get_popular_recipes(
+    goal: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=20),
+    recipe_service: RecipeRecommendationService = Depends(get_recipe_service),
+    db: AsyncSession = Depends(get_db),
+):
+    recipes = await recipe_service.get_popular_recipes(db, goal, limit)
+    return {"recipes": recipes, "goal": goal or "general"}
+
 @router.get("/alternatives")
 async def recipe_alternatives(item: str):
     return {
@@ -150,29 +235,31 @@ async def recipe_alternatives(item: str):
     }
 
 @router.get("/history")
-async def get_recipe_generation_history(current_user: User = Depends(get_current_user), db: Session = Depends(get_db), limit: int = Query(20, ge=1, le=100)):
-    history_logs = db.query(DetectionLog)\
-        .filter(DetectionLog.user_id == current_user.id)\
-        .filter(DetectionLog.recommended_recipe_ids.isnot(None))\
-        .order_by(DetectionLog.created_at.desc())\
-        .limit(limit)\
-        .all()
+async def get_recipe_generation_history(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db), limit: int = Query(20, ge=1, le=100)):
+    result = await db.execute(
+        select(
+            DetectionLog.id,
+            DetectionLog.detected_ingredients,
+            DetectionLog.recommended_recipe_ids,
+            DetectionLog.created_at,
+        )
+        .where(DetectionLog.user_id == current_user.id)
+        .where(DetectionLog.recommended_recipe_ids.isnot(None))
+        .order_by(DetectionLog.created_at.desc())
+        .limit(limit)
+    )
+    history_logs = result.all()
     
-    history = []
-    for log in history_logs:
-        try:
-            ingredients = json.loads(log.detected_ingredients) if log.detected_ingredients else []
-            recipes = json.loads(log.recommended_recipe_ids) if log.recommended_recipe_ids else []
-            
-            history.append({
-                "id": log.id,
-                "ingredients": ingredients,
-                "generated_recipes": recipes,
-                "created_at": log.created_at,
-                "generation_type": "ai_generated"
-            })
-        except json.JSONDecodeError:
-            continue
+    history = [
+        {
+            "id": log.id,
+            "ingredients": log.detected_ingredients or [],
+            "generated_recipes": log.recommended_recipe_ids or [],
+            "created_at": log.created_at,
+            "generation_type": "ai_generated"
+        }
+        for log in history_logs
+    ]
     
     return {
         "history": history,
@@ -1,10 +1,13 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, Text, DateTime, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Boolean, Column, Integer, String, Float, Text, DateTime, ForeignKey, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 
-Base = declarative_base()
+from app.db.database import Base
+
+# JSONB on Postgres (indexable, no text round-trip), generic JSON elsewhere
+JSONVariant = JSON().with_variant(JSONB(), "postgresql")
 
 class User(Base):
     __tablename__ = "users"
@@ -28,7 +31,10 @@ class User(Base):
     target_protein_g = Column(Float, nullable=True)
     target_carbs_g = Column(Float, nullable=True)
     target_fats_g = Column(Float, nullable=True)
-    
+    # fingerprint of the inputs the targets above were computed from, so
+    # recalculation can be skipped when nothing relevant changed
+    nutrition_inputs_hash = Column(String, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -54,25 +60,43 @@ class Recipe(Base):
     
     ingredients = Column(Text)
     tags = Column(String)
-    
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_recipe_calories", "calories_per_serving"),
+        Index("ix_recipe_protein", "protein_g"),
+    )
+
 class DetectionLog(Base):
     __tablename__ = "detection_logs"
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     
-    detected_ingredients = Column(Text)
-    confidence_scores = Column(Text) 
+    detected_ingredients = Column(JSONVariant)
+    confidence_scores = Column(JSONVariant)
     image_path = Column(String, nullable=True)
-    
-    recommended_recipe_ids = Column(Text) 
-    
+
+    recommended_recipe_ids = Column(JSONVariant)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
+
     user = relationship("User", back_populates="detection_logs")
 
+    __table_args__ = (
+        Index("ix_det_ing_gin", "detected_ingredients", postgresql_using="gin"),
+        # history endpoints: WHERE user_id = ? ORDER BY created_at DESC LIMIT ?
+        Index("ix_detlog_user_created", "user_id", text("created_at DESC")),
+        # recipe history additionally filters recommended_recipe_ids IS NOT NULL
+        Index(
+            "ix_detlog_recs",
+            "user_id",
+            text("created_at DESC"),
+            postgresql_where=text("recommended_recipe_ids IS NOT NULL"),
+        ),
+    )
+
 
 class MealLog(Base):
     __tablename__ = "meal_logs"
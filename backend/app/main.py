@@ -1,7 +1,9 @@
 from fastapi import FastAPI, HTTPException, Depends, File, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import os
+import concurrent.futures
 from pathlib import Path
 
 # routes
@@ -16,16 +18,16 @@ from app.api.routes_meals import router as meals_router
 from app.api.routes_recipe_likes import router as recipe_likes_router
 
 # database
-from app.db.database import engine, Base
-from app.services.detect_service import IngredientDetectionService
+from app.db.database import engine, Base, SessionLocal
+from app.services.detect_service import get_detection_service
 from app.services.recipe_service import groq_recipe_service
-
-Base.metadata.create_all(bind=engine)
+from app.services.recipe_recommendation_service import RecipeRecommendationService
 
 app = FastAPI(
     title="NutriLens AI API",
     description="AI-powered nutrition and recipe recommendation system with Groq LLM",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -38,10 +40,31 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
+    # create_all reflects every table on each boot, which slows startup and
+    # does not handle schema changes anyway - in production run alembic
+    # migrations instead and leave this off
+    if os.getenv("AUTO_CREATE_TABLES", "true").lower() in ("1", "true", "yes"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # dedicated pool for model inference so it never starves the default
+    # threadpool shared with sync dependencies
+    app.state.infer_pool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+
+    app.state.recipe_service = RecipeRecommendationService()
     try:
-        app.state.detector = IngredientDetectionService()
+        # needs the recipes table; with AUTO_CREATE_TABLES off the schema is
+        # owned by migrations, and seeding must not keep the app from booting
+        async with SessionLocal() as db:
+            await app.state.recipe_service.seed_sample_recipes(db)
+    except Exception as e:
+        print(f"Failed to seed sample recipes: {e}")
+
+    try:
+        app.state.detector = get_detection_service()
+        app.state.detector.start_batcher(app.state.infer_pool)
         print("Ingredient detection service initialized")
-        
+
         if groq_recipe_service.client:
             print("Groq recipe generation service initialized")
         else:
@@ -50,6 +73,12 @@ async def startup_event():
     except Exception as e:
         print(f"Failed to initialize services: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    if app.state.detector:
+        await app.state.detector.stop_batcher()
+    app.state.infer_pool.shutdown(wait=True)
+
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(detect_router, prefix="/api/detect", tags=["Detection"])
 app.include_router(recipes_router, prefix="/api/recipes", tags=["AI Recipes"])
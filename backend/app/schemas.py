@@ -1,7 +1,20 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict
+import re
+
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Optional, List, Dict
 from datetime import datetime
 
+# lightweight replacement for EmailStr: one compiled regex instead of
+# pulling email-validator onto the request path
+_email_re = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def _validate_email(value: str) -> str:
+    if not _email_re.match(value):
+        raise ValueError("value is not a valid email address")
+    return value.lower()
+
+EmailStr = Annotated[str, AfterValidator(_validate_email)]
+
 class UserBase(BaseModel):
     email: EmailStr
 
@@ -51,12 +64,16 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    exp: Optional[float] = None
 
 class IngredientDetection(BaseModel):
     ingredient: str
     confidence: float
     bbox: List[float]
 
+    class Config:
+        from_attributes = True
+
 class DetectionResponse(BaseModel):
     ingredients: List[IngredientDetection]
     detected_count: int
@@ -174,3 +191,7 @@ class PantryItemRecord(BaseModel):
 class RecipeLikeSync(BaseModel):
     recipe_id: str
     liked: bool = True
+
+# touch the compiled validator once at import so the first real request
+# doesn't pay the core-schema build cost
+UserCreate.__pydantic_validator__
@@ -0,0 +1,55 @@
+import threading
+import time
+import hashlib
+from typing import Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.db.models import User
+
+# Verified-token cache: sha256(token)[:32] -> (email, exp).
+# A hit skips the JWT signature check, so a token revoked server-side stays
+# usable for up to the TTL window. 30s is short enough that we accept this
+# trade-off in exchange for dropping the per-request HMAC cost.
+_tok_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+# email -> detached User instance, re-attached via db.merge(load=False) on hit.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+
+_lock = threading.Lock()
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def get_cached_token(key: str) -> Optional[Tuple[str, float]]:
+    with _lock:
+        entry = _tok_cache.get(key)
+    if entry is None:
+        return None
+    email, exp = entry
+    if exp and exp <= time.time():
+        return None
+    return entry
+
+
+def store_token(key: str, email: str, exp: Optional[float]):
+    """Cache a successfully verified token. Failed validations are never cached."""
+    with _lock:
+        _tok_cache[key] = (email, exp or 0.0)
+
+
+def get_cached_user(email: str) -> Optional[User]:
+    with _lock:
+        return _user_cache.get(email)
+
+
+def store_user(email: str, user: User):
+    with _lock:
+        _user_cache[email] = user
+
+
+def invalidate_user(email: str):
+    with _lock:
+        _user_cache.pop(email, None)
@@ -0,0 +1,70 @@
+"""
+Compiled kernels for the nutrition math.
+
+The string-to-code mapping happens in the callers so these stay pure float
+arithmetic that numba can compile to machine code. With cache=True the
+compile cost is paid once per machine; when numba is not installed the
+plain-Python definitions run unchanged.
+"""
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+        return wrap
+
+GENDER_MALE = 0
+GENDER_FEMALE = 1
+
+GOAL_MAINTAIN = 0
+GOAL_BULK = 1
+GOAL_CUT = 2
+
+
+@njit(cache=True)
+def bmr_kernel(weight_kg: float, height_cm: float, age: float, gender_code: int) -> float:
+    base = 10.0 * weight_kg + 6.25 * height_cm - 5.0 * age
+    if gender_code == GENDER_MALE:
+        return base + 5.0
+    return base - 161.0
+
+
+@njit(cache=True)
+def tdee_kernel(bmr: float, multiplier: float) -> float:
+    return bmr * multiplier
+
+
+@njit(cache=True)
+def target_calories_kernel(tdee: float, goal_code: int, current_weight: float) -> float:
+    adjustment = min(500.0, max(300.0, current_weight * 5.0))
+    if goal_code == GOAL_BULK:
+        return tdee + adjustment
+    if goal_code == GOAL_CUT:
+        return tdee - adjustment
+    return tdee
+
+
+# kcal-per-gram reciprocals; multiplying beats dividing on every CPU
+QUARTER = 0.25
+NINTH = 1.0 / 9.0
+
+
+@njit(cache=True)
+def macros_kernel(target_calories: float, goal_code: int):
+    if goal_code == GOAL_BULK:
+        protein_ratio, carbs_ratio, fats_ratio = 0.30, 0.40, 0.30
+    elif goal_code == GOAL_CUT:
+        protein_ratio, carbs_ratio, fats_ratio = 0.35, 0.30, 0.35
+    else:
+        protein_ratio, carbs_ratio, fats_ratio = 0.25, 0.45, 0.30
+
+    return (
+        target_calories * protein_ratio * QUARTER,
+        target_calories * carbs_ratio * QUARTER,
+        target_calories * fats_ratio * NINTH,
+    )
@@ -1,16 +1,26 @@
-from typing import Dict, Tuple
-from sqlalchemy.orm import Session
+import hashlib
+from typing import Dict, List, Tuple
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import User
+from app.services import nutrition_kernels as nk
 
 class NutritionCalculatorService:
     ACTIVITY_MULTIPLIERS = {
         'sedentary': 1.2,
         'light': 1.375,
         'moderate': 1.55,
-        'active': 1.725, 
-        'very_active': 1.9 
+        'active': 1.725,
+        'very_active': 1.9
     }
-    
+
+    _GOAL_CODES = {'bulk': nk.GOAL_BULK, 'cut': nk.GOAL_CUT}
+
+    # (protein, carbs, fats) calorie ratios per goal
+    _MACRO_RATIOS = {'bulk': (0.30, 0.40, 0.30), 'cut': (0.35, 0.30, 0.35)}
+    _DEFAULT_RATIOS = (0.25, 0.45, 0.30)
+
     @staticmethod
     def calculate_bmr(weight_kg: float, height_cm: float, age: int, gender: str) -> float:
         """
@@ -18,51 +28,27 @@ class NutritionCalculatorService:
         Men: BMR = 10 × weight(kg) + 6.25 × height(cm) - 5 × age + 5
         Women: BMR = 10 × weight(kg) + 6.25 × height(cm) - 5 × age - 161
         """
-        base_bmr = 10 * weight_kg + 6.25 * height_cm - 5 * age
-        
-        if gender.lower() == 'male':
-            return base_bmr + 5
-        else:
-            return base_bmr - 161
-    
+        gender_code = nk.GENDER_MALE if gender.lower() == 'male' else nk.GENDER_FEMALE
+        return nk.bmr_kernel(float(weight_kg), float(height_cm), float(age), gender_code)
+
     @staticmethod
     def calculate_tdee(bmr: float, activity_level: str) -> float:
         """Calculate Total Daily Energy Expenditure"""
         multiplier = NutritionCalculatorService.ACTIVITY_MULTIPLIERS.get(activity_level, 1.55)
-        return bmr * multiplier
-    
+        return nk.tdee_kernel(float(bmr), multiplier)
+
     @staticmethod
     def calculate_target_calories(tdee: float, goal: str, current_weight: float, target_weight: float) -> float:
         """Calculate target calories based on goal"""
-        if goal == 'bulk':
-            surplus = min(500, max(300, current_weight * 5))
-            return tdee + surplus
-        elif goal == 'cut':
-            deficit = min(500, max(300, current_weight * 5))
-            return tdee - deficit
-        else:
-            return tdee
-    
+        goal_code = NutritionCalculatorService._GOAL_CODES.get(goal, nk.GOAL_MAINTAIN)
+        return nk.target_calories_kernel(float(tdee), goal_code, float(current_weight))
+
     @staticmethod
     def calculate_macros(target_calories: float, goal: str) -> Dict[str, float]:
         """Calculate target macronutrients in grams"""
-        if goal == 'bulk':
-            protein_ratio = 0.30
-            carbs_ratio = 0.40 
-            fats_ratio = 0.30 
-        elif goal == 'cut':
-            protein_ratio = 0.35 
-            carbs_ratio = 0.30  
-            fats_ratio = 0.35  
-        else: 
-            protein_ratio = 0.25  
-            carbs_ratio = 0.45 
-            fats_ratio = 0.30     
-
-        protein_g = (target_calories * protein_ratio) / 4
-        carbs_g = (target_calories * carbs_ratio) / 4
-        fats_g = (target_calories * fats_ratio) / 9
-        
+        goal_code = NutritionCalculatorService._GOAL_CODES.get(goal, nk.GOAL_MAINTAIN)
+        protein_g, carbs_g, fats_g = nk.macros_kernel(float(target_calories), goal_code)
+
         return {
             'protein_g': round(protein_g, 1),
             'carbs_g': round(carbs_g, 1),
@@ -70,11 +56,29 @@ class NutritionCalculatorService:
         }
     
     @staticmethod
-    def update_user_nutrition_profile(db: Session, user: User) -> User:
-        """Calculate and update user's nutrition profile"""
+    async def update_user_nutrition_profile(db: AsyncSession, user: User, commit: bool = False) -> User:
+        """
+        Calculate and update user's nutrition profile
+        Flushes by default so callers already inside a transaction (signup,
+        profile update) commit once themselves; pass commit=True otherwise
+        """
         if not all([user.current_weight_kg, user.height_cm, user.age, user.gender]):
             return user
-        
+
+        # deterministic fingerprint of every input that feeds the formulas;
+        # identical inputs always yield identical targets, so skip the rest
+        inputs_hash = hashlib.sha1(repr((
+            user.current_weight_kg,
+            user.height_cm,
+            user.age,
+            user.gender,
+            user.activity_level,
+            user.goal,
+            user.target_weight_kg,
+        )).encode()).hexdigest()
+        if inputs_hash == user.nutrition_inputs_hash:
+            return user
+
         bmr = NutritionCalculatorService.calculate_bmr(
             user.current_weight_kg, 
             user.height_cm, 
@@ -99,8 +103,67 @@ class NutritionCalculatorService:
         user.target_protein_g = macros['protein_g']
         user.target_carbs_g = macros['carbs_g']
         user.target_fats_g = macros['fats_g']
-        
-        db.commit()
-        db.refresh(user)
-        
-        return user
\ No newline at end of file
+        user.nutrition_inputs_hash = inputs_hash
+
+        # no refresh: every column written above came from Python, so the
+        # in-memory object is already current
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+
+        return user
+
+    @staticmethod
+    async def bulk_update(db: AsyncSession, users: List[User]) -> int:
+        """
+        Recalculate nutrition profiles for a batch of users in one pass
+        Vectorizes the Mifflin-St Jeor math with numpy and issues a single
+        executemany UPDATE instead of N per-user commits (for cron/admin jobs)
+        """
+        eligible = [u for u in users if all([u.current_weight_kg, u.height_cm, u.age, u.gender])]
+        if not eligible:
+            return 0
+
+        weight = np.array([u.current_weight_kg for u in eligible], dtype=np.float64)
+        height = np.array([u.height_cm for u in eligible], dtype=np.float64)
+        age = np.array([u.age for u in eligible], dtype=np.float64)
+        male = np.array([u.gender.lower() == 'male' for u in eligible])
+
+        bmr = 10 * weight + 6.25 * height - 5 * age + np.where(male, 5.0, -161.0)
+
+        multipliers = np.array([
+            NutritionCalculatorService.ACTIVITY_MULTIPLIERS.get(u.activity_level or 'moderate', 1.55)
+            for u in eligible
+        ])
+        tdee = bmr * multipliers
+
+        goals = [u.goal or 'maintain' for u in eligible]
+        adjustment = np.clip(weight * 5, 300, 500)
+        sign = np.array([1.0 if g == 'bulk' else -1.0 if g == 'cut' else 0.0 for g in goals])
+        target_calories = tdee + sign * adjustment
+
+        ratio_table = NutritionCalculatorService._MACRO_RATIOS
+        default_ratios = NutritionCalculatorService._DEFAULT_RATIOS
+        ratios = np.array([ratio_table.get(g, default_ratios) for g in goals])
+        protein_g = target_calories * ratios[:, 0] * nk.QUARTER
+        carbs_g = target_calories * ratios[:, 1] * nk.QUARTER
+        fats_g = target_calories * ratios[:, 2] * nk.NINTH
+
+        params = [
+            {
+                "id": u.id,
+                "bmr": round(float(bmr[i]), 1),
+                "tdee": round(float(tdee[i]), 1),
+                "target_calories": round(float(target_calories[i]), 1),
+                "target_protein_g": round(float(protein_g[i]), 1),
+                "target_carbs_g": round(float(carbs_g[i]), 1),
+                "target_fats_g": round(float(fats_g[i]), 1),
+            }
+            for i, u in enumerate(eligible)
+        ]
+
+        await db.execute(update(User), params)
+        await db.commit()
+
+        return len(params)
\ No newline at end of file
@@ -0,0 +1,348 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Recipe, User
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeRecommendationService:
+    """Local ingredient-match recommendations over a curated recipe list.
+
+    Complements GroqRecipeService: this path needs no API key and answers
+    instantly from the built-in sample recipes.
+    """
+
+    def __init__(self):
+        self.sample_recipes: List[Dict] = [
+            {
+                "name": "Tomato Garlic Pasta",
+                "description": "Simple pasta tossed with fresh tomato and garlic",
+                "instructions": "Cook pasta. Saute garlic, add chopped tomato, toss with pasta.",
+                "prep_time_minutes": 10,
+                "cook_time_minutes": 15,
+                "servings": 2,
+                "calories_per_serving": 380,
+                "protein_g": 12,
+                "carbs_g": 62,
+                "fats_g": 9,
+                "fiber_g": 4,
+                "ingredients": "pasta, tomato, garlic, olive oil",
+                "tags": "vegetarian, quick",
+            },
+            {
+                "name": "Spinach Mushroom Omelette",
+                "description": "Fluffy omelette loaded with spinach and mushroom",
+                "instructions": "Whisk eggs. Saute mushroom and spinach, pour eggs over, fold.",
+                "prep_time_minutes": 5,
+                "cook_time_minutes": 10,
+                "servings": 1,
+                "calories_per_serving": 290,
+                "protein_g": 21,
+                "carbs_g": 6,
+                "fats_g": 20,
+                "fiber_g": 2,
+                "ingredients": "egg, spinach, mushroom, olive oil",
+                "tags": "high-protein, quick, vegetarian",
+            },
+            {
+                "name": "Grilled Chicken Salad",
+                "description": "Lean grilled chicken over crunchy vegetables",
+                "instructions": "Grill chicken. Chop vegetables, slice chicken, dress and serve.",
+                "prep_time_minutes": 15,
+                "cook_time_minutes": 12,
+                "servings": 2,
+                "calories_per_serving": 320,
+                "protein_g": 34,
+                "carbs_g": 10,
+                "fats_g": 15,
+                "fiber_g": 4,
+                "ingredients": "chicken breast, spinach, tomato, bell pepper, olive oil",
+                "tags": "high-protein, low-carb",
+            },
+            {
+                "name": "Paneer Bell Pepper Stir Fry",
+                "description": "Paneer cubes tossed with peppers and onion",
+                "instructions": "Cube paneer. Stir fry onion and peppers, add paneer and spices.",
+                "prep_time_minutes": 10,
+                "cook_time_minutes": 12,
+                "servings": 2,
+                "calories_per_serving": 360,
+                "protein_g": 20,
+                "carbs_g": 14,
+                "fats_g": 25,
+                "fiber_g": 3,
+                "ingredients": "paneer, bell pepper, onion, garlic, olive oil",
+                "tags": "vegetarian, high-protein",
+            },
+            {
+                "name": "Salmon Quinoa Bowl",
+                "description": "Seared salmon on a bed of quinoa and greens",
+                "instructions": "Cook quinoa. Sear salmon, flake over quinoa with spinach.",
+                "prep_time_minutes": 10,
+                "cook_time_minutes": 20,
+                "servings": 2,
+                "calories_per_serving": 450,
+                "protein_g": 32,
+                "carbs_g": 35,
+                "fats_g": 20,
+                "fiber_g": 5,
+                "ingredients": "salmon, quinoa, spinach, olive oil",
+                "tags": "high-protein, omega-3",
+            },
+            {
+                "name": "Veggie Fried Rice",
+                "description": "Leftover rice stir fried with mixed vegetables and egg",
+                "instructions": "Scramble egg. Stir fry vegetables, add rice and egg, season.",
+                "prep_time_minutes": 10,
+                "cook_time_minutes": 10,
+                "servings": 2,
+                "calories_per_serving": 400,
+                "protein_g": 14,
+                "carbs_g": 58,
+                "fats_g": 12,
+                "fiber_g": 3,
+                "ingredients": "rice, egg, onion, bell pepper, garlic",
+                "tags": "quick, budget",
+            },
+            {
+                "name": "Banana Oat Breakfast Bowl",
+                "description": "Warm oats topped with banana and yogurt",
+                "instructions": "Cook oats. Slice banana on top, finish with a spoon of yogurt.",
+                "prep_time_minutes": 5,
+                "cook_time_minutes": 5,
+                "servings": 1,
+                "calories_per_serving": 340,
+                "protein_g": 12,
+                "carbs_g": 60,
+                "fats_g": 6,
+                "fiber_g": 7,
+                "ingredients": "oats, banana, yogurt",
+                "tags": "breakfast, vegetarian, quick",
+            },
+            {
+                "name": "Lentil Spinach Curry",
+                "description": "Hearty lentils simmered with spinach and aromatics",
+                "instructions": "Saute onion and garlic. Add lentils and water, simmer, stir in spinach.",
+                "prep_time_minutes": 10,
+                "cook_time_minutes": 25,
+                "servings": 3,
+                "calories_per_serving": 310,
+                "protein_g": 18,
+                "carbs_g": 45,
+                "fats_g": 7,
+                "fiber_g": 12,
+                "ingredients": "lentils, spinach, onion, garlic, tomato",
+                "tags": "vegan, high-fiber, budget",
+            },
+            {
+                "name": "Tofu Veggie Scramble",
+                "description": "Crumbled tofu scrambled with peppers and onion",
+                "instructions": "Crumble tofu. Saute onion and pepper, add tofu, season and cook through.",
+                "prep_time_minutes": 8,
+                "cook_time_minutes": 10,
+                "servings": 2,
+                "calories_per_serving": 250,
+                "protein_g": 17,
+                "carbs_g": 10,
+                "fats_g": 16,
+                "fiber_g": 3,
+                "ingredients": "tofu, bell pepper, onion, garlic, olive oil",
+                "tags": "vegan, high-protein, quick",
+            },
+            {
+                "name": "Greek Yogurt Apple Parfait",
+                "description": "Layers of greek yogurt, apple, and toasted oats",
+                "instructions": "Layer yogurt, diced apple, and oats in a glass. Chill briefly.",
+                "prep_time_minutes": 5,
+                "cook_time_minutes": 0,
+                "servings": 1,
+                "calories_per_serving": 230,
+                "protein_g": 15,
+                "carbs_g": 35,
+                "fats_g": 4,
+                "fiber_g": 4,
+                "ingredients": "greek yogurt, apple, oats",
+                "tags": "breakfast, snack, high-protein",
+            },
+        ]
+        self.build_index()
+
+    def build_index(self):
+        """
+        Precompute the ingredient-term index over sample_recipes
+        One binary recipe x ingredient matrix built at startup turns per-request
+        matching into a single matrix-vector product
+        """
+        self._ingredient_lists = [
+            [i.strip().lower() for i in r["ingredients"].split(",")]
+            for r in self.sample_recipes
+        ]
+        # frozensets built once here so per-request set algebra doesn't
+        # rebuild a set per recipe
+        self._ingredient_sets = [frozenset(lst) for lst in self._ingredient_lists]
+        self._set_sizes = np.array([len(s) for s in self._ingredient_sets], dtype=np.float32)
+
+        vocab: Dict[str, int] = {}
+        for ingredients in self._ingredient_lists:
+            for ingredient in ingredients:
+                if ingredient not in vocab:
+                    vocab[ingredient] = len(vocab)
+        self._vocab = vocab
+
+        matrix = np.zeros((len(self.sample_recipes), len(vocab)), dtype=np.float32)
+        for row, ingredients in enumerate(self._ingredient_lists):
+            for ingredient in ingredients:
+                matrix[row, vocab[ingredient]] = 1.0
+        self._matrix = matrix
+
+        # nutrition columns packed once so alignment scoring is a handful of
+        # array ops per request instead of a Python loop
+        self._cal = np.array(
+            [r["calories_per_serving"] or 0 for r in self.sample_recipes], dtype=np.float32
+        )
+        self._prot = np.array(
+            [r["protein_g"] or 0 for r in self.sample_recipes], dtype=np.float32
+        )
+
+        # inverted index so matching only ever touches recipes that share
+        # at least one ingredient with the query
+        inverted: Dict[str, List[int]] = defaultdict(list)
+        for row, ingredient_set in enumerate(self._ingredient_sets):
+            for ingredient in ingredient_set:
+                inverted[ingredient].append(row)
+        self._inv = dict(inverted)
+
+    async def seed_sample_recipes(self, db: AsyncSession):
+        """Insert the sample recipes into the recipes table if missing"""
+        names = [r["name"] for r in self.sample_recipes]
+        result = await db.execute(select(Recipe.name).where(Recipe.name.in_(names)))
+        existing = set(result.scalars().all())
+
+        missing = [Recipe(**r) for r in self.sample_recipes if r["name"] not in existing]
+        if missing:
+            db.add_all(missing)
+            await db.commit()
+            logger.info(f"Seeded {len(missing)} sample recipes")
+
+    def find_matching_recipes(
+        self,
+        detected_ingredients: List[str],
+        user: Optional[User] = None,
+        limit: int = 10,
+    ) -> List[Dict]:
+        """Rank sample recipes by overlap with the detected ingredients"""
+        # lower once, up front; the frozenset also dedupes repeated detections
+        detected_set = frozenset(ing.lower() for ing in detected_ingredients)
+
+        query_vector = np.zeros(len(self._vocab), dtype=np.float32)
+        for ingredient in detected_set:
+            index = self._vocab.get(ingredient)
+            if index is not None:
+                query_vector[index] = 1.0
+
+        candidates = sorted(set().union(*(self._inv.get(ing, ()) for ing in detected_set)) if detected_set else ())
+        if not candidates:
+            return []
+
+        # score only the candidate rows instead of the whole matrix
+        cand = np.asarray(candidates, dtype=np.intp)
+        match_counts = self._matrix[cand] @ query_vector
+        match_scores = match_counts / self._set_sizes[cand]
+
+        if user is not None and user.goal:
+            overall_scores, calorie_scores, protein_scores = self._score_all(user.goal)
+            alignment = overall_scores[cand]
+        else:
+            overall_scores = None
+            alignment = np.full(len(cand), 0.5, dtype=np.float32)
+
+        composite = match_scores * 0.6 + alignment * 0.4
+
+        # rank first, then build result dicts only for the winners
+        if len(cand) > limit:
+            # O(n) partition for the top-k, then sort only those k
+            top = np.argpartition(-composite, limit - 1)[:limit]
+        else:
+            top = np.arange(len(cand))
+        top = top[np.argsort(-composite[top])]
+
+        recommendations = []
+        for pos in top:
+            i = candidates[pos]
+            recipe_set = self._ingredient_sets[i]
+
+            if overall_scores is None:
+                nutrition_alignment = {"overall_score": 0.5}
+            else:
+                nutrition_alignment = {
+                    "overall_score": round(float(overall_scores[i]), 2),
+                    "calorie_score": round(float(calorie_scores[i]), 2),
+                    "protein_score": round(float(protein_scores[i]), 2),
+                }
+
+            recommendations.append({
+                "recipe": self.sample_recipes[i],
+                "match_score": round(float(match_scores[pos]), 2),
+                "matched_ingredients": list(recipe_set & detected_set),
+                "missing_ingredients": list(recipe_set - detected_set),
+                "nutrition_alignment": nutrition_alignment,
+            })
+
+        return recommendations
+
+    def _score_all(self, goal: str):
+        """Nutrition alignment for every recipe at once (vectorized)"""
+        if goal == "bulk":
+            calorie_scores = np.minimum(1.0, self._cal / 450)
+            protein_scores = np.minimum(1.0, self._prot / 30)
+        elif goal == "cut":
+            calorie_scores = np.maximum(0.1, 1.0 - np.maximum(0, self._cal - 350) / 200)
+            protein_scores = np.minimum(1.0, self._prot / 25)
+        else:
+            calorie_scores = 1.0 - np.abs(self._cal - 375) / 375
+            protein_scores = np.minimum(1.0, self._prot / 20)
+
+        calorie_scores = np.clip(calorie_scores, 0, 1)
+        protein_scores = np.clip(protein_scores, 0, 1)
+
+        return (calorie_scores + protein_scores) / 2, calorie_scores, protein_scores
+
+    async def search_recipes(
+        self,
+        db: AsyncSession,
+        query: Optional[str] = None,
+        tag: Optional[str] = None,
+        max_calories: Optional[float] = None,
+        min_protein: Optional[float] = None,
+        limit: int = 20,
+    ) -> List[Recipe]:
+        """Filter recipes in SQL by name, tag, and nutrition bounds"""
+        stmt = select(Recipe)
+        if query:
+            stmt = stmt.where(Recipe.name.ilike(f"%{query}%"))
+        if tag:
+            stmt = stmt.where(Recipe.tags.ilike(f"%{tag}%"))
+        if max_calories is not None:
+            stmt = stmt.where(Recipe.calories_per_serving <= max_calories)
+        if min_protein is not None:
+            stmt = stmt.where(Recipe.protein_g >= min_protein)
+
+        result = await db.execute(stmt.limit(limit))
+        return result.scalars().all()
+
+    async def get_popular_recipes(self, db: AsyncSession, goal: Optional[str] = None, limit: int = 5) -> List[Recipe]:
+        """Goal-aware shortlist, filtered in SQL"""
+        stmt = select(Recipe)
+        if goal == "bulk":
+            stmt = stmt.where(Recipe.calories_per_serving >= 350)
+        elif goal == "cut":
+            stmt = stmt.where(Recipe.tags.contains("high-protein"), Recipe.calories_per_serving <= 350)
+
+        result = await db.execute(stmt.limit(limit))
+        return result.scalars().all()
@@ -1,19 +1,169 @@
+import asyncio
+import hashlib
+import operator
+import re
 import os
-import json
+import orjson
+import sqlite3
+import time
+import numpy as np
 from typing import List, Dict, Optional
-from groq import Groq
-from sqlalchemy.orm import Session
-from app.db.models import Recipe, User
+from groq import AsyncGroq
+from app.db.models import User
+from app.services.food_catalog_service import food_catalog_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Compact schema shipped in the prompt instead of a 30-line worked example;
+# response_format={"type": "json_object"} already forces valid JSON, so the
+# model only needs the shape, not a full sample payload
+RECIPE_SCHEMA_LINE = (
+    "{recipes:[{name:str,description:str,"
+    "ingredients:[{name:str,amount:str,unit:str}],"
+    "instructions:[str],"
+    "nutrition_per_serving:{calories:int,protein_g:float,carbs_g:float,fats_g:float,fiber_g:float},"
+    "prep_time_minutes:int,cook_time_minutes:int,servings:int,"
+    "tags:[str],difficulty:'easy'|'medium'|'hard',primary_ingredients:[str]}]}"
+)
+
+# identical on every call, so built once instead of re-allocated per request
+RECIPE_SYSTEM_MSG = {
+    "role": "system",
+    "content": "You are a professional nutritionist and chef AI assistant. Generate healthy, practical recipes with accurate nutritional information in valid JSON format."
+}
+MEAL_PLAN_SYSTEM_MSG = {
+    "role": "system",
+    "content": "You are a professional nutritionist creating meal plans. Generate practical, balanced meal plans in valid JSON format."
+}
+
+GOAL_BLOCKS = {
+    "bulk": """
+            GOAL-SPECIFIC REQUIREMENTS:
+            - Focus on high-calorie, protein-rich recipes (400+ calories per serving)
+            - Include complex carbohydrates for energy
+            - Aim for 25-35g protein per recipe
+            - Include healthy fats
+            """,
+    "cut": """
+            GOAL-SPECIFIC REQUIREMENTS:
+            - Focus on low-calorie, high-protein recipes (200-350 calories per serving)
+            - Emphasize lean proteins and vegetables
+            - Minimize refined carbohydrates
+            - Aim for 20-30g protein per recipe
+            """,
+    "maintain": """
+            GOAL-SPECIFIC REQUIREMENTS:
+            - Balanced nutrition (300-400 calories per serving)
+            - Include all macronutrients in healthy proportions
+            - Aim for 15-25g protein per recipe
+            """,
+}
+
 class GroqRecipeService:
-    
+
+    # generated recipes don't go stale quickly; repeated dev/demo calls and
+    # repeat users with the same pantry hit the cache instead of the API
+    CACHE_TTL_SECONDS = 6 * 3600
+
     def __init__(self):
         self.client = None
+        self._cache = sqlite3.connect(
+            os.getenv("RECIPE_CACHE_PATH", "./recipe_cache.db"), check_same_thread=False
+        )
+        self._cache.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, payload BLOB, created_at REAL)"
+        )
+        self._cache.commit()
+        # (canonical ingredient tokens, context, exact-cache key) triples
+        self._semantic_index = []
+        # cache key -> future for generations currently in flight, so
+        # concurrent identical requests share one upstream call
+        self._inflight: Dict[str, asyncio.Future] = {}
         self._initialize_groq_client()
-        
+
+    def _cache_key(self, ingredients: List[str], user: Optional[User], extra: Dict) -> str:
+        """Deterministic key over everything that affects the LLM output"""
+        canonical = orjson.dumps({
+            "ingredients": sorted(i.strip().lower() for i in ingredients),
+            "goal": user.goal if user else None,
+            "target_calories": user.target_calories if user else None,
+            "target_protein_g": user.target_protein_g if user else None,
+            **extra,
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(canonical).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        row = self._cache.execute(
+            "SELECT payload, created_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        payload, created_at = row
+        if time.time() - created_at > self.CACHE_TTL_SECONDS:
+            self._cache.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._cache.commit()
+            return None
+        return orjson.loads(payload)
+
+    def _cache_put(self, key: str, value: Dict) -> None:
+        self._cache.execute(
+            "INSERT OR REPLACE INTO cache (key, payload, created_at) VALUES (?, ?, ?)",
+            (key, orjson.dumps(value), time.time()),
+        )
+        self._cache.commit()
+
+    # paraphrased pantries ("eggs, tomatoes" vs "tomato, egg") should reuse
+    # the same generation; near-duplicates are found by Jaccard similarity
+    # over catalog-canonicalized ingredient tokens
+    SEMANTIC_SIM_THRESHOLD = 0.9
+    # every lookup scans the index linearly, so cap it at the most recent
+    # generations instead of letting a long-lived worker grow it forever
+    SEMANTIC_INDEX_MAX = 512
+
+    @staticmethod
+    def _canonical_tokens(ingredients: List[str]) -> frozenset:
+        """Map ingredient names onto catalog canonical names"""
+        tokens = set()
+        for ing in ingredients:
+            name = ing.strip().lower()
+            item = food_catalog_service.find(name)
+            if item is not None:
+                tokens.add(item.canonical_name)
+                continue
+            # crude singularization so "tomatoes" and "tomato" still agree
+            if name.endswith("es") and len(name) > 4:
+                name = name[:-2]
+            elif name.endswith("s") and len(name) > 3:
+                name = name[:-1]
+            tokens.add(name)
+        return frozenset(tokens)
+
+    def _semantic_lookup(self, tokens: frozenset, context: tuple) -> Optional[Dict]:
+        best_key = None
+        best_sim = 0.0
+        for cached_tokens, cached_context, key in self._semantic_index:
+            if cached_context != context or not (tokens or cached_tokens):
+                continue
+            sim = len(tokens & cached_tokens) / len(tokens | cached_tokens)
+            if sim > best_sim:
+                best_sim, best_key = sim, key
+        if best_key is not None and best_sim >= self.SEMANTIC_SIM_THRESHOLD:
+            hit = self._cache_get(best_key)
+            if hit is None:
+                # the backing sqlite row expired; drop the stale entry so it
+                # stops winning lookups it can no longer serve
+                self._semantic_index = [
+                    entry for entry in self._semantic_index if entry[2] != best_key
+                ]
+            return hit
+        return None
+
+    def _semantic_remember(self, tokens: frozenset, context: tuple, key: str) -> None:
+        self._semantic_index.append((tokens, context, key))
+        if len(self._semantic_index) > self.SEMANTIC_INDEX_MAX:
+            del self._semantic_index[: -self.SEMANTIC_INDEX_MAX]
+
     def _initialize_groq_client(self):
         """Initialize Groq client"""
         try:
@@ -22,14 +172,14 @@ class GroqRecipeService:
                 logger.warning("GROQ_API_KEY not found in environment variables")
                 return
                 
-            self.client = Groq(api_key=api_key)
+            self.client = AsyncGroq(api_key=api_key)
             logger.info("Groq client initialized successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {e}")
             self.client = None
 
-    def generate_recipes(
+    async def generate_recipes(
         self, 
         ingredients: List[str], 
         user: Optional[User] = None,
@@ -40,51 +190,207 @@ class GroqRecipeService:
         """
         if not self.client:
             return self._fallback_recipes(ingredients, user, recipe_count)
-        
+
+        cache_key = self._cache_key(ingredients, user, {
+            "kind": "recipes",
+            "recipe_count": recipe_count,
+            "model": "llama-3.1-70b-versatile",
+            "temperature": 0.7,
+        })
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        tokens = self._canonical_tokens(ingredients)
+        context = (user.goal if user else None, recipe_count)
+        near_hit = self._semantic_lookup(tokens, context)
+        if near_hit is not None:
+            return near_hit
+
+        # an identical generation already in flight? await its result instead
+        # of issuing a duplicate Groq call
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
         try:
-            prompt = self._build_recipe_prompt(ingredients, user, recipe_count)
-            
-            chat_completion = self.client.chat.completions.create(
+            try:
+                prompt = self._build_recipe_prompt(ingredients, user, recipe_count)
+
+                chat_completion = await self.client.chat.completions.create(
+                    messages=[
+                        RECIPE_SYSTEM_MSG,
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    model="llama-3.1-70b-versatile",
+                    temperature=0.7,
+                    max_tokens=2048,
+                    response_format={"type": "json_object"}
+                )
+
+                response_text = chat_completion.choices[0].message.content
+                recipes_data = orjson.loads(response_text)
+
+                processed_recipes = self._process_generated_recipes(
+                    recipes_data,
+                    ingredients,
+                    user
+                )
+
+                response = {
+                    "recipes": processed_recipes,
+                    "generation_method": "groq_llm",
+                    "model_used": "llama-3.1-70b-versatile",
+                    "total_count": len(processed_recipes),
+                    "user_goal": user.goal if user else "general"
+                }
+                self._cache_put(cache_key, response)
+                self._semantic_remember(tokens, context, cache_key)
+
+            except orjson.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON from Groq response: {e}")
+                response = self._fallback_recipes(ingredients, user, recipe_count)
+
+            except Exception as e:
+                logger.error(f"Error generating recipes with Groq: {e}")
+                response = self._fallback_recipes(ingredients, user, recipe_count)
+
+            future.set_result(response)
+            return response
+
+        finally:
+            # if the leader was cancelled before producing a result, wake the
+            # followers instead of leaving them awaiting forever
+            if not future.done():
+                future.cancel()
+            del self._inflight[cache_key]
+
+    async def generate_recipes_batch(
+        self,
+        batch: List[Dict],
+        max_concurrency: int = 10,
+    ) -> List[Dict]:
+        """
+        Generate recipes for several requests concurrently (admin/offline use)
+        Each batch entry is {"ingredients": [...], "user": ..., "recipe_count": ...};
+        a semaphore bounds the fan-out so large batches don't trip Groq rate
+        limits, and one failed entry falls back instead of sinking the rest
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(entry: Dict) -> Dict:
+            async with semaphore:
+                return await self.generate_recipes(
+                    ingredients=entry["ingredients"],
+                    user=entry.get("user"),
+                    recipe_count=entry.get("recipe_count", 5),
+                )
+
+        results = await asyncio.gather(
+            *(bounded(entry) for entry in batch), return_exceptions=True
+        )
+        return [
+            result if not isinstance(result, BaseException)
+            else self._fallback_recipes(
+                entry["ingredients"], entry.get("user"), entry.get("recipe_count", 5)
+            )
+            for entry, result in zip(batch, results)
+        ]
+
+    async def generate_recipes_and_plan(
+        self,
+        ingredients: List[str],
+        user: Optional[User] = None,
+        recipe_count: int = 5,
+        days: int = 3,
+    ) -> Dict:
+        """
+        Generate recipes and a meal plan in one Groq call
+        The two requests always travel together in a session, so fusing them
+        saves a full network round trip and queue wait for the second one
+        """
+        if not self.client:
+            return {**self._fallback_recipes(ingredients, user, recipe_count), "meal_plan": []}
+
+        cache_key = self._cache_key(ingredients, user, {
+            "kind": "recipes_and_plan",
+            "recipe_count": recipe_count,
+            "days": days,
+            "model": "llama-3.1-70b-versatile",
+            "temperature": 0.7,
+        })
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        prompt = self._compress_prompt(
+            self._build_recipe_prompt(ingredients, user, recipe_count)
+            + f'\n\nADDITIONALLY: also create a {days}-day meal plan (breakfast, lunch, dinner '
+            'per day, reusing the recipes above where sensible) and include it in the SAME '
+            'JSON object under a top-level "meal_plan" key shaped like: '
+            '{"meal_plan": [{"day": 1, "meals": {"breakfast": {"name": "...", "calories": 0, '
+            '"protein_g": 0}, "lunch": {...}, "dinner": {...}}, '
+            '"daily_totals": {"calories": 0, "protein_g": 0}}]}'
+        )
+
+        try:
+            chat_completion = await self.client.chat.completions.create(
                 messages=[
+                    RECIPE_SYSTEM_MSG,
                     {
-                        "role": "system",
-                        "content": "You are a professional nutritionist and chef AI assistant. Generate healthy, practical recipes with accurate nutritional information in valid JSON format."
-                    },
-                    {
-                        "role": "user", 
+                        "role": "user",
                         "content": prompt
                     }
                 ],
                 model="llama-3.1-70b-versatile",
                 temperature=0.7,
-                max_tokens=2048,
+                max_tokens=4096,
                 response_format={"type": "json_object"}
             )
-            
-            response_text = chat_completion.choices[0].message.content
-            recipes_data = json.loads(response_text)
-            
-            processed_recipes = self._process_generated_recipes(
-                recipes_data, 
-                ingredients, 
-                user
-            )
-            
-            return {
+
+            data = orjson.loads(chat_completion.choices[0].message.content)
+            processed_recipes = self._process_generated_recipes(data, ingredients, user)
+
+            response = {
                 "recipes": processed_recipes,
+                "meal_plan": data.get("meal_plan", []),
                 "generation_method": "groq_llm",
                 "model_used": "llama-3.1-70b-versatile",
                 "total_count": len(processed_recipes),
+                "days": days,
                 "user_goal": user.goal if user else "general"
             }
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON from Groq response: {e}")
-            return self._fallback_recipes(ingredients, user, recipe_count)
-            
+            self._cache_put(cache_key, response)
+            return response
+
         except Exception as e:
-            logger.error(f"Error generating recipes with Groq: {e}")
-            return self._fallback_recipes(ingredients, user, recipe_count)
+            logger.error(f"Error generating fused recipes + meal plan: {e}")
+            return {**self._fallback_recipes(ingredients, user, recipe_count), "meal_plan": []}
+
+    # phrases that add tokens but no constraints the model acts on
+    _FILLER_PHRASES = (
+        "Make the recipes creative yet practical, focusing on nutrition and taste!",
+        "Use the available ingredients creatively while ensuring nutritional balance.",
+    )
+
+    @staticmethod
+    def _compress_prompt(text: str) -> str:
+        """
+        Rule-based prompt compression: drop filler, strip the deep template
+        indentation and collapse runs of whitespace. Input tokens dominate
+        per-call latency and cost, and none of this carries meaning
+        """
+        for phrase in GroqRecipeService._FILLER_PHRASES:
+            text = text.replace(phrase, "")
+        text = re.sub(r"\n[ \t]+", "\n", text)
+        text = re.sub(r"[ \t]{2,}", " ", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip()
 
     def _build_recipe_prompt(
         self, 
@@ -111,30 +417,8 @@ class GroqRecipeService:
             if user.target_protein_g:
                 user_context += f"- Target Protein/day: {user.target_protein_g}g\n"
         
-        goal_instructions = ""
-        if user and user.goal == "bulk":
-            goal_instructions = """
-                                    GOAL-SPECIFIC REQUIREMENTS:
-                                    - Focus on high-calorie, protein-rich recipes (400+ calories per serving)
-                                    - Include complex carbohydrates for energy
-                                    - Aim for 25-35g protein per recipe
-                                    - Include healthy fats
-                                """
-        elif user and user.goal == "cut":
-            goal_instructions = """
-                                    GOAL-SPECIFIC REQUIREMENTS:
-                                    - Focus on low-calorie, high-protein recipes (200-350 calories per serving)
-                                    - Emphasize lean proteins and vegetables
-                                    - Minimize refined carbohydrates
-                                    - Aim for 20-30g protein per recipe
-                                """
-        else:
-            goal_instructions = """
-                                    GOAL-SPECIFIC REQUIREMENTS:
-                                    - Balanced nutrition (300-400 calories per serving)
-                                    - Include all macronutrients in healthy proportions
-                                    - Aim for 15-25g protein per recipe
-                                """
+        goal = user.goal if user else None
+        goal_instructions = GOAL_BLOCKS.get(goal, GOAL_BLOCKS["maintain"])
 
         prompt = f"""
                     Generate {recipe_count} healthy, practical recipes using primarily these available ingredients: {ingredients_text}
@@ -151,89 +435,140 @@ class GroqRecipeService:
                     5. Give clear, step-by-step instructions
                     6. Suggest recipe tags (e.g., "high-protein", "quick", "vegetarian")
 
-                    RESPONSE FORMAT - Return a valid JSON object with this exact structure:
-                    {{
-                    "recipes": [
-                        {{
-                        "name": "Recipe Name",
-                        "description": "Brief description",
-                        "ingredients": [
-                            {{
-                            "name": "ingredient name",
-                            "amount": "quantity",
-                            "unit": "measurement unit"
-                            }}
-                        ],
-                        "instructions": [
-                            "Step 1...",
-                            "Step 2...",
-                            "Step 3..."
-                        ],
-                        "nutrition_per_serving": {{
-                            "calories": 0,
-                            "protein_g": 0,
-                            "carbs_g": 0,
-                            "fats_g": 0,
-                            "fiber_g": 0
-                        }},
-                        "prep_time_minutes": 0,
-                        "cook_time_minutes": 0,
-                        "servings": 0,
-                        "tags": ["tag1", "tag2"],
-                        "difficulty": "easy|medium|hard",
-                        "primary_ingredients": ["ingredient1", "ingredient2"]
-                        }}
-                    ]
-                    }}
+                    RESPONSE FORMAT - Return a valid JSON object matching: {RECIPE_SCHEMA_LINE}
 
                     Make the recipes creative yet practical, focusing on nutrition and taste!
                 """
-        
-        return prompt
+
+        return self._compress_prompt(prompt)
+
+    async def stream_recipes(
+        self,
+        ingredients: List[str],
+        user: Optional[User] = None,
+        recipe_count: int = 5,
+    ):
+        """
+        Yield processed recipes one by one as the model finishes them, so the
+        first recipe is available in first-recipe time instead of
+        full-generation time.
+
+        The streamed text is scanned once with a brace-depth counter: objects
+        opening at depth 1 are elements of the top-level "recipes" array, and
+        only those completed slices are parsed.
+        """
+        if not self.client:
+            for recipe in self._fallback_recipes(ingredients, user, recipe_count)["recipes"]:
+                yield recipe
+            return
+
+        prompt = self._build_recipe_prompt(ingredients, user, recipe_count)
+        orig_arr = np.char.lower(np.asarray(ingredients, dtype=str))
+
+        stream = await self.client.chat.completions.create(
+            messages=[
+                RECIPE_SYSTEM_MSG,
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            model="llama-3.1-70b-versatile",
+            temperature=0.7,
+            max_tokens=2048,
+            response_format={"type": "json_object"},
+            stream=True,
+        )
+
+        buffer = []
+        depth = 0
+        in_string = False
+        escaped = False
+        recipe_start = -1
+        position = 0
+
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content or ""
+            for ch in delta:
+                buffer.append(ch)
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = in_string
+                elif ch == '"':
+                    in_string = not in_string
+                elif not in_string:
+                    if ch == "{":
+                        if depth == 1:
+                            recipe_start = position
+                        depth += 1
+                    elif ch == "}":
+                        depth -= 1
+                        if depth == 1 and recipe_start >= 0:
+                            raw = "".join(buffer[recipe_start:position + 1])
+                            recipe_start = -1
+                            try:
+                                recipe = orjson.loads(raw)
+                            except orjson.JSONDecodeError as e:
+                                logger.warning(f"Skipping malformed streamed recipe: {e}")
+                                continue
+                            processed = self._process_single_recipe(recipe, orig_arr, user)
+                            if processed is not None:
+                                yield processed
+                position += 1
+
+    def _process_single_recipe(self, recipe: Dict, orig_arr: np.ndarray, user: Optional[User]) -> Optional[Dict]:
+        """Score and annotate one generated recipe (orig_arr: lowered originals)"""
+        try:
+            primary_ingredients = recipe.get("primary_ingredients", [])
+            if primary_ingredients and orig_arr.size:
+                # broadcast both substring directions in C instead of a
+                # Python double loop
+                prim = np.char.lower(np.asarray(primary_ingredients, dtype=str))
+                hits = (
+                    (np.char.find(prim[:, None], orig_arr[None, :]) >= 0)
+                    | (np.char.find(orig_arr[None, :], prim[:, None]) >= 0)
+                ).any(axis=1)
+                matched_ingredients = [
+                    ing for ing, hit in zip(primary_ingredients, hits) if hit
+                ]
+            else:
+                matched_ingredients = []
+
+            match_score = len(matched_ingredients) / max(len(primary_ingredients), 1)
+
+            nutrition_alignment = self._calculate_nutrition_alignment_groq(
+                recipe, user
+            )
+            return {
+                **recipe,
+                "match_score": round(match_score, 2),
+                "matched_ingredients": matched_ingredients,
+                "nutrition_alignment": nutrition_alignment,
+                # composite ranking score, computed once here so sorting
+                # doesn't redo the dict lookups per comparison
+                "_score": match_score * 0.6 + nutrition_alignment["overall_score"] * 0.4,
+                "generation_method": "groq_llm"
+            }
+
+        except Exception as e:
+            logger.warning(f"Error processing recipe: {e}")
+            return None
 
     def _process_generated_recipes(self, recipes_data: Dict, original_ingredients: List[str], user: Optional[User]) -> List[Dict]:
-        processed_recipes = []
-        
         if "recipes" not in recipes_data:
             logger.warning("No 'recipes' key found in generated data")
             return []
-        
-        for recipe in recipes_data["recipes"]:
-            try:
-                primary_ingredients = recipe.get("primary_ingredients", [])
-                matched_ingredients = [
-                    ing for ing in primary_ingredients 
-                    if any(orig.lower() in ing.lower() or ing.lower() in orig.lower() 
-                          for orig in original_ingredients)
-                ]
-                
-                match_score = len(matched_ingredients) / max(len(primary_ingredients), 1)
-                
-                nutrition_alignment = self._calculate_nutrition_alignment_groq(
-                    recipe, user
-                )
-                processed_recipe = {
-                    **recipe,
-                    "match_score": round(match_score, 2),
-                    "matched_ingredients": matched_ingredients,
-                    "nutrition_alignment": nutrition_alignment,
-                    "generation_method": "groq_llm"
-                }
-                
-                processed_recipes.append(processed_recipe)
-                
-            except Exception as e:
-                logger.warning(f"Error processing recipe: {e}")
-                continue
-        
-        processed_recipes.sort(
-            key=lambda x: (
-                x.get("match_score", 0) * 0.6 + 
-                x.get("nutrition_alignment", {}).get("overall_score", 0) * 0.4
-            ),
-            reverse=True
-        )
-        
+
+        orig_arr = np.char.lower(np.asarray(original_ingredients, dtype=str))
+        processed_recipes = [
+            processed
+            for recipe in recipes_data["recipes"]
+            if (processed := self._process_single_recipe(recipe, orig_arr, user)) is not None
+        ]
+
+        processed_recipes.sort(key=operator.itemgetter("_score"), reverse=True)
+
         return processed_recipes
 
     def _calculate_nutrition_alignment_groq(self, recipe: Dict, user: Optional[User]) -> Dict[str, float]:
@@ -309,19 +644,26 @@ class GroqRecipeService:
             "user_goal": user.goal if user else "general"
         }
 
-    def generate_meal_plan(self, ingredients: List[str], user: Optional[User], days: int = 3) -> Dict:        
+    async def generate_meal_plan(self, ingredients: List[str], user: Optional[User], days: int = 3) -> Dict:        
         if not self.client:
             return {"error": "Groq service unavailable", "meal_plan": []}
-        
+
+        cache_key = self._cache_key(ingredients, user, {
+            "kind": "meal_plan",
+            "days": days,
+            "model": "llama-3.1-70b-versatile",
+            "temperature": 0.6,
+        })
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             prompt = self._build_meal_plan_prompt(ingredients, user, days)
             
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = await self.client.chat.completions.create(
                 messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional nutritionist creating meal plans. Generate practical, balanced meal plans in valid JSON format."
-                    },
+                    MEAL_PLAN_SYSTEM_MSG,
                     {
                         "role": "user",
                         "content": prompt
@@ -334,15 +676,17 @@ class GroqRecipeService:
             )
             
             response_text = chat_completion.choices[0].message.content
-            meal_plan_data = json.loads(response_text)
+            meal_plan_data = orjson.loads(response_text)
             
-            return {
+            response = {
                 "meal_plan": meal_plan_data,
                 "generation_method": "groq_llm",
                 "days": days,
                 "user_goal": user.goal if user else "general"
             }
-            
+            self._cache_put(cache_key, response)
+            return response
+
         except Exception as e:
             logger.error(f"Error generating meal plan: {e}")
             return {"error": str(e), "meal_plan": []}
@@ -359,7 +703,7 @@ class GroqRecipeService:
                             - Daily Protein Target: {user.target_protein_g or 'not specified'}g
                         """
 
-        return f"""
+        prompt = f"""
                     Create a {days}-day meal plan using these available ingredients: {ingredients_text}
 
                     {user_info}
@@ -381,4 +725,6 @@ class GroqRecipeService:
                     ]
                     }}
                 """
+        return self._compress_prompt(prompt)
+
 groq_recipe_service = GroqRecipeService()
\ No newline at end of file
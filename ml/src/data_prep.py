@@ -1,26 +1,113 @@
 import os
+import torch
 from torchvision import datasets, transforms
-from torch.utils.data import DataLoader, random_split
+from torchvision.io import ImageReadMode, decode_jpeg
+from torch.utils.data import DataLoader, Subset, random_split
+
+try:
+    from torchvision.transforms import v2
+except ImportError:  # older torchvision without the v2 namespace
+    v2 = None
 
 DATA_DIR = "../data/raw"
 BATCH_SIZE = 16
 IMG_SIZE = 224
+# fixed seed + persisted indices: the train/val split must not re-shuffle
+# between runs, or every run trains on images it will later validate on
+SPLIT_SEED = 42
+SPLIT_PATH = "../runs/split.pt"
+# capped: beyond ~8 workers the decode pipeline outruns the GPU anyway
+NUM_WORKERS = min(8, os.cpu_count() or 4)
+
+MEAN = [0.485, 0.456, 0.406]
+STD = [0.229, 0.224, 0.225]
+
+# nvJPEG decode + tensor transforms skip PIL entirely; only worth it (and
+# only supported) when a GPU is present
+USE_GPU_DECODE = v2 is not None and torch.cuda.is_available()
 
 transform = transforms.Compose([
     transforms.Resize((IMG_SIZE, IMG_SIZE)),
     transforms.ToTensor(),
-    transforms.Normalize( mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+    transforms.Normalize( mean=MEAN, std=STD)
 ])
 
-dataset = datasets.ImageFolder(DATA_DIR, transform=transform)
+def _read_encoded(path):
+    """Loader that returns the raw JPEG bytes as a uint8 tensor"""
+    with open(path, "rb") as f:
+        return torch.frombuffer(f.read(), dtype=torch.uint8)
+
+def _gpu_decode_collate(batch):
+    """Decode the whole batch on the GPU and run the v2 transform there"""
+    encoded = [sample for sample, _ in batch]
+    labels = torch.tensor([label for _, label in batch])
+    images = decode_jpeg(encoded, device="cuda", mode=ImageReadMode.RGB)
+    images = torch.stack([_gpu_transform(img) for img in images])
+    # channels_last feeds Tensor Cores without a layout conversion later
+    return images.contiguous(memory_format=torch.channels_last), labels
+
+if USE_GPU_DECODE:
+    _gpu_transform = v2.Compose([
+        v2.Resize((IMG_SIZE, IMG_SIZE), antialias=True),
+        v2.ToDtype(torch.float32, scale=True),
+        v2.Normalize(mean=MEAN, std=STD),
+    ])
+
+def build_loaders():
+    if USE_GPU_DECODE:
+        dataset = datasets.ImageFolder(DATA_DIR, loader=_read_encoded)
+    else:
+        dataset = datasets.ImageFolder(DATA_DIR, transform=transform)
+
+    if os.path.exists(SPLIT_PATH):
+        split = torch.load(SPLIT_PATH)
+        train_dataset = Subset(dataset, split["train"])
+        val_dataset = Subset(dataset, split["val"])
+    else:
+        train_size = int(0.8 * len(dataset))
+        val_size = len(dataset) - train_size
+        generator = torch.Generator().manual_seed(SPLIT_SEED)
+        train_dataset, val_dataset = random_split(
+            dataset, [train_size, val_size], generator=generator
+        )
+        os.makedirs(os.path.dirname(SPLIT_PATH), exist_ok=True)
+        torch.save(
+            {"train": list(train_dataset.indices), "val": list(val_dataset.indices)},
+            SPLIT_PATH,
+        )
+
+    if USE_GPU_DECODE:
+        # decode happens in the collate on the GPU, so keep it in the main
+        # process (CUDA does not survive forked workers) and skip pinning
+        # (the batch is already device memory)
+        loader_kwargs = dict(num_workers=0, collate_fn=_gpu_decode_collate)
+    else:
+        # workers decode/resize in parallel with GPU compute; pinned memory
+        # makes the host-to-device copy asynchronous
+        loader_kwargs = dict(
+            num_workers=NUM_WORKERS,
+            pin_memory=True,
+            persistent_workers=True,
+            prefetch_factor=4,
+        )
 
-train_size = int(0.8 * len(dataset))
-val_size = len(dataset) - train_size
-train_dataset, val_dataset = random_split(dataset, [train_size, val_size])
+    train_loader = DataLoader(
+        train_dataset,
+        batch_size=BATCH_SIZE,
+        shuffle=True,
+        drop_last=True,
+        **loader_kwargs,
+    )
+    val_loader = DataLoader(
+        val_dataset,
+        batch_size=BATCH_SIZE,
+        **loader_kwargs,
+    )
 
-train_loader = DataLoader(train_dataset, batch_size=BATCH_SIZE, shuffle=True)
-val_loader = DataLoader(val_dataset, batch_size=BATCH_SIZE)
+    return dataset, train_loader, val_loader
 
-print("Classes: ", dataset.classes)
-print("Training samples: ", len(train_dataset))
-print("Validation samples: ", len(val_dataset))
+if __name__ == "__main__":
+    dataset, train_loader, val_loader = build_loaders()
+    print("Classes: ", dataset.classes)
+    print("Training samples: ", len(train_loader.dataset))
+    print("Validation samples: ", len(val_loader.dataset))
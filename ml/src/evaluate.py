@@ -1,4 +1,5 @@
 import yaml
+import torch
 from ultralytics import YOLO
 from pathlib import Path
 
@@ -23,7 +24,8 @@ def evaluate_model():
     with open('ml/runs/test_data.yaml', 'w') as f:
         yaml.dump(data_config, f)
     
-    metrics = model.val(data='ml/runs/test_data.yaml', split='test')
+    # FP16 eval matches the precision the backend serves at
+    metrics = model.val(data='ml/runs/test_data.yaml', split='test', half=torch.cuda.is_available())
     
     print(f"mAP50: {metrics.box.map50}")
     print(f"mAP50-95: {metrics.box.map}")
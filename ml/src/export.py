@@ -0,0 +1,29 @@
+import os
+from ultralytics import YOLO
+
+WEIGHTS = 'ml/models/ingredient_detector.pt'
+CALIBRATION_DATA = 'ml/runs/test_data.yaml'
+
+def export_engine():
+    """
+    Export the trained detector to a TensorRT engine next to the .pt
+    INT8 post-training quantization is used when the calibration yaml from
+    evaluate.py exists, otherwise FP16; IngredientDetector picks the engine
+    up automatically at startup
+    """
+    model = YOLO(WEIGHTS)
+
+    use_int8 = os.path.exists(CALIBRATION_DATA)
+    engine_path = model.export(
+        format='engine',
+        half=not use_int8,
+        int8=use_int8,
+        data=CALIBRATION_DATA if use_int8 else None,
+        dynamic=False,
+        imgsz=640,
+        workspace=4,
+    )
+    print(f"Exported TensorRT engine ({'INT8' if use_int8 else 'FP16'}): {engine_path}")
+
+if __name__ == "__main__":
+    export_engine()